@@ -0,0 +1,161 @@
+import json
+import math
+import argparse
+import serial
+
+def door_stats_app_main():
+
+    # Parse command line arguments
+    description ='aggregate door motion statistics across servodoor devices'
+    parser = argparse.ArgumentParser(description=description)
+
+    port_help = 'device ports, e.g. /dev/ttyACM0 /dev/ttyACM1, COM1, etc.'
+    parser.add_argument('-p', '--port', type=str, nargs='+', help=port_help, default=[])
+    file_help = 'json files containing saved door_stats responses'
+    parser.add_argument('-f', '--file', type=str, nargs='+', help=file_help, default=[])
+    reset_help = 'reset the statistics on the devices after reading them'
+    parser.add_argument('-r', '--reset', action='store_true', help=reset_help)
+    out_help = 'optional output file for the aggregated and per-source statistics (json)'
+    parser.add_argument('-o', '--out', type=str, help=out_help, required=False)
+
+    args = parser.parse_args()
+    if not args.port and not args.file:
+        parser.error('at least one port or file is required')
+
+    # Collect door statistics from devices and files keyed by source
+    source_stats = {}
+    for port in args.port:
+        source_stats[port] = get_device_stats(port, reset=args.reset)
+    for stats_file in args.file:
+        source_stats[stats_file] = get_file_stats(stats_file)
+
+    agg_stats = aggregate_stats(source_stats)
+    print_stats(agg_stats, source_stats)
+
+    if args.out is not None:
+        out = {'doors': agg_stats, 'sources': source_stats}
+        with open(args.out, 'w') as f:
+            json.dump(out, f, indent=4)
+
+
+def get_device_stats(port, reset=False, timeout=2.0):
+    """ Send door_stats command to the device on port and return the stats """
+    msg = {'cmd': 'door_stats', 'reset': reset}
+    with serial.Serial(port, 115200, timeout=timeout) as dev:
+        dev.reset_input_buffer()
+        dev.write(f'{json.dumps(msg)}\n'.encode())
+        while True:
+            line = dev.readline()
+            if not line:
+                print(f'error: no response from {port}')
+                exit(0)
+            try:
+                rsp = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(rsp, dict) and 'ok' in rsp:
+                break
+    if not rsp['ok']:
+        print(f'error: {port}: {rsp.get("err", "")}')
+        exit(0)
+    return rsp['door_stats']
+
+
+def get_file_stats(stats_file):
+    """ Load door statistics from a saved json door_stats response """
+    try:
+        with open(stats_file, 'r') as f:
+            data = json.load(f)
+    except OSError:
+        print(f'error: unable to read {stats_file}')
+        exit(0)
+    except ValueError:
+        print(f'error: {stats_file} parse error')
+        exit(0)
+    return data.get('door_stats', data)
+
+
+def aggregate_stats(source_stats):
+    """
+    Combine per-door statistics from several sources (devices or files).
+    Counts, travel, motion time and histograms are summed, peaks are maxed and
+    RMS accelerations are combined weighted by time in motion.
+    """
+    agg_stats = {}
+    for door_stats in source_stats.values():
+        for name, stats in door_stats.items():
+            if name not in agg_stats:
+                agg_stats[name] = {
+                        'num_devices': 0,
+                        'move_count': 0,
+                        'travel': 0,
+                        'motion_time': 0.0,
+                        'peak_vel': 0.0,
+                        'peak_acc': 0.0,
+                        'rms_acc': 0.0,
+                        'hist_edges': stats['hist_edges'],
+                        'hist': [0]*len(stats['hist']),
+                        }
+            agg = agg_stats[name]
+            if stats['hist_edges'] != agg['hist_edges']:
+                print(f'error: {name} histogram edges do not match')
+                exit(0)
+            sum_acc_sq = agg['rms_acc']**2*agg['motion_time']
+            sum_acc_sq += stats['rms_acc']**2*stats['motion_time']
+            agg['num_devices'] += 1
+            agg['move_count'] += stats['move_count']
+            agg['travel'] += stats['travel']
+            agg['motion_time'] += stats['motion_time']
+            agg['peak_vel'] = max(agg['peak_vel'], stats['peak_vel'])
+            agg['peak_acc'] = max(agg['peak_acc'], stats['peak_acc'])
+            if agg['motion_time'] > 0:
+                agg['rms_acc'] = math.sqrt(sum_acc_sq/agg['motion_time'])
+            agg['hist'] = [a + b for a, b in zip(agg['hist'], stats['hist'])]
+    return agg_stats
+
+
+def print_stats(agg_stats, source_stats):
+    """
+    Print table of door statistics. Each door's aggregate row (all sources) is
+    followed by one row per source so individual servos can be compared.
+    """
+    width = max([len(s) for s in source_stats] + [len('all')]) + 2
+    header = f'{"door":<14}{"source":<{width}}{"moves":>8}{"travel":>12}{"time":>9}'
+    header += f'{"peak_vel":>10}{"peak_acc":>10}{"rms_acc":>10}'
+    print()
+    print(header)
+    print('-'*len(header))
+    for name, agg in agg_stats.items():
+        print(stats_row(name, 'all', agg, width))
+        for source, door_stats in source_stats.items():
+            if name in door_stats:
+                print(stats_row('', source, door_stats[name], width))
+    print()
+    print('move duration histogram (s)')
+    for name, agg in agg_stats.items():
+        print(hist_row(name, 'all', agg, width))
+        for source, door_stats in source_stats.items():
+            if name in door_stats:
+                print(hist_row('', source, door_stats[name], width))
+    print()
+
+
+def stats_row(name, source, stats, width):
+    """ Returns table row of statistics for a door """
+    row = f'{name:<14}{source:<{width}}{stats["move_count"]:>8}'
+    row += f'{stats["travel"]:>12.0f}{stats["motion_time"]:>9.2f}'
+    row += f'{stats["peak_vel"]:>10.1f}{stats["peak_acc"]:>10.1f}{stats["rms_acc"]:>10.1f}'
+    return row
+
+
+def hist_row(name, source, stats, width):
+    """ Returns row with the move duration histogram for a door """
+    edges = stats['hist_edges']
+    labels = [f'<={e}' for e in edges] + [f'>{edges[-1]}']
+    bins = ', '.join(f'{l}: {n}' for l, n in zip(labels, stats['hist']))
+    return f'  {name:<14}{source:<{width}}{bins}'
+
+# -----------------------------------------------------------------------------
+if __name__ == '__main__':
+
+    door_stats_app_main()
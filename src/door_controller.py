@@ -3,6 +3,7 @@ import servo
 import constants
 from messaging import Messenger
 from dynamic_door import DynamicDoor
+from door_stats import DoorStats
 from configuration import Configuration
 
 class DoorController:
@@ -34,6 +35,7 @@ class DoorController:
         Set up dynamic models for door motion
         """
         self.dynamic_doors = {}
+        self.door_stats = {}
         for name, data in self.config.servo_data.items():
             self.dynamic_doors[name] = DynamicDoor(
                     dt = self.DOOR_DT,
@@ -42,6 +44,10 @@ class DoorController:
                     max_vel = float(data['max_vel']),
                     max_acc = float(data['max_acc']),
                     )
+            self.door_stats[name] = DoorStats(
+                    dt = self.DOOR_DT,
+                    pwm = round(float(data['close'])),
+                    )
 
     def add_error_msg(self,msg):
         """
@@ -71,7 +77,15 @@ class DoorController:
 
     def update_doors(self):
         for name, model in self.dynamic_doors.items():
+            was_moving = not model.at_set_pos
             model.update()
+            if was_moving:
+                self.door_stats[name].update(
+                        model.pos,
+                        model.vel,
+                        model.acc,
+                        model.at_set_pos,
+                        )
             if not model.at_set_pos:
                 pwm = round(model.pos)
                 num = self.config.servo_data[name]['index']
@@ -124,6 +138,8 @@ class DoorController:
             rsp = self.cmd_config_errors()
         elif cmd == 'positions':
             rsp = self.cmd_get_positions()
+        elif cmd == 'door_stats':
+            rsp = self.cmd_door_stats(msg)
         else:
             self.add_error_msg('unknown cmd')
             rsp = {'ok': False}
@@ -164,7 +180,12 @@ class DoorController:
                 continue
             #num = data['index']
             #self.doors.pulse(num, pwm, load=False)
-            self.dynamic_doors[name].set_pos = pwm
+            # A change of set point while moving ends the current move, e.g. a
+            # reversal, so that it is counted separately in the door stats.
+            model = self.dynamic_doors[name]
+            if pwm != model.set_pos and not model.at_set_pos:
+                self.door_stats[name].end_move()
+            model.set_pos = pwm
             self.door_state[name] = position
         #self.doors.load()
         rsp['doors'] = self.door_state
@@ -216,6 +237,20 @@ class DoorController:
             positions[name] = model.pos
         rsp = {'ok': True, 'positions': positions}
         return rsp
+
+    def cmd_door_stats(self, msg):
+        """
+        Returns the accumulated motion statistics for all doors. If the msg
+        contains 'reset': true the statistics are cleared after being read.
+        """
+        door_stats = {}
+        for name, stats in self.door_stats.items():
+            door_stats[name] = stats.as_dict()
+        if msg.get('reset', False):
+            for stats in self.door_stats.values():
+                stats.reset()
+        rsp = {'ok': True, 'door_stats': door_stats}
+        return rsp
            
 
     def cmd_config_errors(self):
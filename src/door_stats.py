@@ -0,0 +1,140 @@
+import math
+
+class DoorStats:
+    """
+    Accumulates motion statistics for a single door from the position, velocity
+    and acceleration of its DynamicDoor model. Statistics are updated
+    incrementally every time step so that no raw samples need to be stored.
+
+    All statistics, including the peaks, are tracked per move and merged into
+    the totals when the move completes.
+
+    The firmware uses single precision floats, so long running float sums would
+    lose small per time step additions once they grow large. To avoid this
+    travel is kept as an exact integer sum of the |change| in the (rounded) pwm
+    sent to the servo, and each move's sum of acc**2 is added to the lifetime
+    total using compensated (Kahan) summation. The remaining error in rms_acc
+    is bounded by the per move sum, roughly move_steps*eps (~4e-5 relative for
+    a 1.5 s move at dt=0.0025).
+    """
+
+    # Upper edges (s) of the move duration histogram bins. The last bin
+    # collects all moves longer than the final edge. Full open/close moves
+    # with typical max_vel/max_acc take ~1-1.6 s, partial moves (reversals)
+    # fall in the lower bins.
+    HIST_EDGES = (0.25, 0.5, 0.75, 1.0, 1.25, 1.5, 1.75, 2.0, 2.25, 2.5)
+
+    def __init__(self, dt=0.01, pwm=0):
+        self.dt = dt
+        self.hist = [0]*(len(self.HIST_EDGES) + 1)
+        self.pwm = pwm           # Last (rounded) pwm position
+        self.moving = False      # True while a move is in progress
+        self.move_steps = 0      # Number of time steps in current move
+        self.move_travel = 0     # Travel (us) in current move
+        self.move_acc_sq = 0.0   # Sum of acc**2 in current move
+        self.move_peak_vel = 0.0 # Peak |vel| in current move
+        self.move_peak_acc = 0.0 # Peak |acc| in current move
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all accumulated statistics. The state of any move in progress is
+        kept so that it is counted in full when it completes.
+        """
+        self.move_count = 0      # Number of completed moves
+        self.travel = 0          # Total distance traveled (us)
+        self.motion_steps = 0    # Number of time steps spent in motion
+        self.peak_vel = 0.0      # Peak |vel|
+        self.peak_acc = 0.0      # Peak |acc|
+        self.sum_acc_sq = 0.0    # Sum of acc**2 over time steps in motion
+        self.sum_acc_sq_c = 0.0  # Compensation term for sum_acc_sq
+        for i in range(len(self.hist)):
+            self.hist[i] = 0
+
+    def update(self, pos, vel, acc, done):
+        """
+        Called every time step while the door's trajectory is active with the
+        model's current pos, vel and acc. The flag done should be True on the
+        time step where the door reaches its set point.
+        """
+        if vel != 0.0 or acc != 0.0:
+            if not self.moving:
+                self.moving = True
+                self.move_steps = 0
+                self.move_travel = 0
+                self.move_acc_sq = 0.0
+                self.move_peak_vel = 0.0
+                self.move_peak_acc = 0.0
+            pwm = round(pos)
+            self.move_travel += abs(pwm - self.pwm)
+            self.pwm = pwm
+            self.move_steps += 1
+            self.move_acc_sq += acc*acc
+            abs_vel = abs(vel)
+            abs_acc = abs(acc)
+            if abs_vel > self.move_peak_vel:
+                self.move_peak_vel = abs_vel
+            if abs_acc > self.move_peak_acc:
+                self.move_peak_acc = abs_acc
+        if done and self.moving:
+            self.end_move()
+
+    def end_move(self):
+        """
+        Ends the move in progress and adds it to the accumulated statistics.
+        Called when the door reaches its set point or when the set point is
+        changed part way through a move (e.g. a reversal). Moves with no
+        travel, e.g. re-sending a door's current state, are discarded.
+        """
+        self.moving = False
+        if self.move_travel == 0:
+            return
+        self.move_count += 1
+        self.motion_steps += self.move_steps
+        self.travel += self.move_travel
+        self.add_acc_sq(self.move_acc_sq)
+        if self.move_peak_vel > self.peak_vel:
+            self.peak_vel = self.move_peak_vel
+        if self.move_peak_acc > self.peak_acc:
+            self.peak_acc = self.move_peak_acc
+        self.hist[self.hist_index(self.move_steps*self.dt)] += 1
+
+    def add_acc_sq(self, val):
+        """ Adds val to sum_acc_sq using compensated (Kahan) summation """
+        y = val - self.sum_acc_sq_c
+        t = self.sum_acc_sq + y
+        self.sum_acc_sq_c = (t - self.sum_acc_sq) - y
+        self.sum_acc_sq = t
+
+    def hist_index(self, duration):
+        """ Returns the histogram bin index for a move of the given duration """
+        for i, edge in enumerate(self.HIST_EDGES):
+            if duration <= edge:
+                return i
+        return len(self.HIST_EDGES)
+
+    @property
+    def motion_time(self):
+        """ Returns the total time (s) spent in motion """
+        return self.motion_steps*self.dt
+
+    @property
+    def rms_acc(self):
+        """ Returns the RMS acceleration over the time spent in motion """
+        if self.motion_steps == 0:
+            return 0.0
+        return math.sqrt(self.sum_acc_sq/self.motion_steps)
+
+    def as_dict(self):
+        """ Returns the statistics as a dict suitable for sending as json """
+        stats = {
+                'move_count': self.move_count,
+                'travel': self.travel,
+                'motion_time': self.motion_time,
+                'peak_vel': self.peak_vel,
+                'peak_acc': self.peak_acc,
+                'rms_acc': self.rms_acc,
+                'hist_edges': list(self.HIST_EDGES),
+                'hist': list(self.hist),
+                }
+        return stats